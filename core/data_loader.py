@@ -4,37 +4,107 @@ Using yfinance as the primary data source.
 """
 
 import yfinance as yf
+import numpy as np
 import pandas as pd
-from typing import Tuple, Optional
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, Tuple, Optional, Union
 import logging
+import re
+import threading
+
+# Hourly parquet cache lives inside the project, never in a shared directory
+DEFAULT_CACHE_DIR = Path(__file__).resolve().parent.parent / ".cache"
+# Only files matching the loader's own '<UTC hour>_<md5>.parquet' naming are ever pruned
+_CACHE_FILE_RE = re.compile(r'^\d{10}_[0-9a-f]{32}\.parquet$')
+
+# In-process memo of cleaned history, keyed by (UTC hour, symbol, period, interval).
+# Entries from earlier hours are dropped, so long-lived callers still get fresh bars.
+_HISTORY_CACHE: Dict[Tuple[str, str, str, str], pd.DataFrame] = {}
+_HISTORY_CACHE_MAXSIZE = 64
+_HISTORY_CACHE_LOCK = threading.Lock()
+
+
+def _hour_bucket() -> str:
+    """Current UTC hour, used to expire cached history"""
+    return datetime.now(timezone.utc).strftime('%Y%m%d%H')
+
+
+def _remember(cache_key: Tuple[str, str, str, str], df: pd.DataFrame):
+    """Store df in the memo, dropping expired hours and the oldest entries beyond the size bound"""
+    with _HISTORY_CACHE_LOCK:
+        for key in [k for k in _HISTORY_CACHE if k[0] != cache_key[0]]:
+            del _HISTORY_CACHE[key]
+        _HISTORY_CACHE[cache_key] = df
+        while len(_HISTORY_CACHE) > _HISTORY_CACHE_MAXSIZE:
+            del _HISTORY_CACHE[next(iter(_HISTORY_CACHE))]
+
+
+@lru_cache(maxsize=64)
+def _get_ticker(symbol: str) -> yf.Ticker:
+    """Reuse one yf.Ticker (and its HTTP session) per symbol"""
+    return yf.Ticker(symbol)
+
 
 class DataLoader:
-    def __init__(self, symbol: str = "CL=F"):
+    def __init__(self, symbol: str = "CL=F", cache_dir: Optional[Union[str, Path]] = DEFAULT_CACHE_DIR):
+        """
+        Args:
+            symbol: Ticker symbol (default: CL=F)
+            cache_dir: Directory for the hourly parquet cache (None disables it)
+        """
         self.symbol = symbol
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else None
+        # True when the last fetch_data() was served from the memo or disk cache
+        self.last_fetch_cached = False
         self.logger = logging.getLogger(__name__)
 
     def fetch_data(self, period: str = "5d", interval: str = "5m") -> pd.DataFrame:
         """
         Fetch OHLCV data from yfinance.
+        Results are memoized in-process per (symbol, period, interval) and written to a
+        parquet cache in cache_dir; both are reused only within the same UTC hour.
         
         Args:
             period: Data period to download (e.g., "1d", "5d", "1mo")
             interval: Data interval (e.g., "1m", "5m", "1h", "1d")
             
         Returns:
-            DataFrame with columns: [Open, High, Low, Close, Volume]
+            DataFrame with float32 columns: [Open, High, Low, Close, Volume]
         """
+        cache_key = (_hour_bucket(), self.symbol, period, interval)
+        cached = _HISTORY_CACHE.get(cache_key)
+        if cached is not None:
+            self.logger.info(f"Using cached {self.symbol} data (Period: {period}, Interval: {interval}).")
+            self.last_fetch_cached = True
+            return cached.copy()
+        
+        cache_path = self._disk_cache_path(period, interval)
+        if cache_path is not None and cache_path.exists():
+            try:
+                df = pd.read_parquet(cache_path)
+                self.logger.info(f"Loaded {len(df)} rows from cache {cache_path}.")
+                _remember(cache_key, df)
+                self.last_fetch_cached = True
+                return df.copy()
+            except Exception as e:
+                self.logger.warning(f"Ignoring unreadable cache {cache_path}: {e}")
+        
         self.logger.info(f"Fetching {self.symbol} data (Period: {period}, Interval: {interval})...")
         
         try:
-            ticker = yf.Ticker(self.symbol)
+            ticker = _get_ticker(self.symbol)
             df = ticker.history(period=period, interval=interval)
             
             if df.empty:
                 raise ValueError(f"No data found for {self.symbol}")
                 
             # Clean data
-            df = df[['Open', 'High', 'Low', 'Close', 'Volume']]
+            # float32 halves the memory traffic of the row-wise passes; per-bin sums stay float64
+            df = df[['Open', 'High', 'Low', 'Close', 'Volume']].astype(np.float32)
             df.index = pd.to_datetime(df.index)
             
             # Ensure proper timezone (UTC -> Local if needed, keeping UTC for analysis)
@@ -42,15 +112,81 @@ class DataLoader:
                 df.index = df.index.tz_localize('UTC')
             
             self.logger.info(f"Successfully loaded {len(df)} rows.")
-            return df
+            _remember(cache_key, df)
+            self.last_fetch_cached = False
+            if cache_path is not None:
+                self._write_disk_cache(cache_path, df)
+            return df.copy()
             
         except Exception as e:
             self.logger.error(f"Error fetching data: {e}")
             raise
 
-    def get_latest_price(self) -> float:
-        """Get the current live price (delayed)"""
-        ticker = yf.Ticker(self.symbol)
+    def _disk_cache_path(self, period: str, interval: str) -> Optional[Path]:
+        """Parquet cache file for this request, named '<UTC hour>_<md5 of request>.parquet'"""
+        if self.cache_dir is None:
+            return None
+        request_key = hashlib.md5(f"{self.symbol}_{period}_{interval}".encode()).hexdigest()
+        return self.cache_dir / f"{_hour_bucket()}_{request_key}.parquet"
+
+    def _write_disk_cache(self, cache_path: Path, df: pd.DataFrame):
+        """Best effort: a failed cache write never fails the fetch"""
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            df.to_parquet(cache_path)
+        except Exception as e:
+            self.logger.warning(f"Could not write cache {cache_path}: {e}")
+            return
+        
+        # Drop this loader's files from earlier hours so the cache does not grow without bound
+        current_hour = cache_path.name.split('_', 1)[0]
+        for stale in cache_path.parent.glob('*.parquet'):
+            if _CACHE_FILE_RE.match(stale.name) and not stale.name.startswith(f"{current_hour}_"):
+                try:
+                    stale.unlink()
+                except OSError as e:
+                    self.logger.warning(f"Could not remove expired cache {stale}: {e}")
+
+    @staticmethod
+    def fetch_many(symbols: Iterable[str], period: str = "5d", interval: str = "5m",
+                   max_workers: int = 8,
+                   cache_dir: Optional[Union[str, Path]] = DEFAULT_CACHE_DIR) -> Dict[str, pd.DataFrame]:
+        """
+        Fetch OHLCV data for several symbols concurrently.
+        Each download is network-bound, so requests are dispatched on a thread pool.
+        
+        Args:
+            symbols: Ticker symbols (duplicates are fetched once)
+            period: Data period to download (e.g., "1d", "5d", "1mo")
+            interval: Data interval (e.g., "1m", "5m", "1h", "1d")
+            max_workers: Upper bound on concurrent downloads
+            cache_dir: Directory for the hourly parquet cache (None disables it)
+            
+        Returns:
+            Dict mapping symbol -> DataFrame (same format as fetch_data)
+        """
+        symbols = list(dict.fromkeys(symbols))
+        if not symbols:
+            return {}
+        
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(symbols))) as pool:
+            futures = {
+                symbol: pool.submit(DataLoader(symbol, cache_dir).fetch_data, period, interval)
+                for symbol in symbols
+            }
+            return {symbol: future.result() for symbol, future in futures.items()}
+
+    def get_latest_price(self, df: Optional[pd.DataFrame] = None) -> float:
+        """
+        Get the current live price (delayed).
+        If the DataFrame from the last fetch_data() is given and was freshly downloaded,
+        its last close is used instead of downloading a separate 1d history.
+        Cached frames can be up to an hour old, so the price is fetched fresh for those.
+        """
+        if df is not None and not df.empty and not self.last_fetch_cached:
+            return float(df['Close'].iloc[-1])
+        
+        ticker = _get_ticker(self.symbol)
         # Fast retrieval
         todays_data = ticker.history(period='1d')
-        return todays_data['Close'].iloc[-1]
+        return float(todays_data['Close'].iloc[-1])
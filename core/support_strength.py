@@ -6,115 +6,162 @@ Support/Resistance Strength Calculator
 import pandas as pd
 import numpy as np
 from typing import Dict, List, Tuple
-from scipy.stats import zscore
+
+
+def count_touches(lows: np.ndarray, prices: np.ndarray, tolerance: np.ndarray) -> np.ndarray:
+    """
+    計算每個價位 ±tolerance 範圍內的K線數 (以Low判斷)
+    Low只排序一次, 每個價位以二分搜尋取得範圍邊界, 總成本 O((n+b) log n)
+    prices已遞增排序時, searchsorted 會沿用前一個邊界, 等同一次合併式掃描
+    """
+    sorted_lows = np.sort(lows)
+    tolerance = np.abs(tolerance)
+    # 邊界轉成Low的dtype (如float32), 避免searchsorted把整個Low陣列轉型複製
+    lower = np.asarray(prices - tolerance, dtype=sorted_lows.dtype)
+    upper = np.asarray(prices + tolerance, dtype=sorted_lows.dtype)
+    left_idx = np.searchsorted(sorted_lows, lower, side='left')
+    right_idx = np.searchsorted(sorted_lows, upper, side='right')
+    return right_idx - left_idx
+
+
+def _rank_descending(values: np.ndarray) -> np.ndarray:
+    """分數越高排名越前, 同分取最小名次 (同 pandas rank(ascending=False, method='min'))"""
+    sorted_values = np.sort(values)
+    return values.size - np.searchsorted(sorted_values, values, side='right') + 1
+
+
+def _smallest_n(ranks: np.ndarray, n: int) -> np.ndarray:
+    """
+    取名次最小的n個索引, 依名次排序
+    同名次保留原順序 (同 DataFrame.nsmallest keep='first'), 以argpartition避免完整排序
+    """
+    if n <= 0 or ranks.size == 0:
+        return np.empty(0, dtype=np.intp)
+    
+    # 名次與原位置合成唯一鍵, 同名次時先出現者優先
+    key = ranks.astype(np.int64) * ranks.size + np.arange(ranks.size)
+    if n < ranks.size:
+        idx = np.argpartition(key, n - 1)[:n]
+    else:
+        idx = np.arange(ranks.size)
+    return idx[np.argsort(key[idx])]
+
 
 class SupportStrengthAnalyzer:
-    def __init__(self, df: pd.DataFrame, volume_profile: pd.Series, bin_prices: Dict):
+    def __init__(self, df: pd.DataFrame, volume_profile: np.ndarray, price_min: float, dx: float):
         """
         Args:
             df: 原始OHLCV資料
-            volume_profile: 從VolumeProfileAnalyzer取得的成交量分佈
-            bin_prices: 價格區間對應表 {bin_idx: price}
+            volume_profile: 從VolumeProfileAnalyzer取得的成交量分佈 (依bin_idx索引的陣列)
+            price_min: 價格區間下界 (VolumeProfileAnalyzer.price_min)
+            dx: 每個價格區間的寬度 (VolumeProfileAnalyzer.dx)
         """
         self.df = df
+        self.lows = df['Low'].to_numpy()
         self.volume_profile = volume_profile
-        self.bin_prices = bin_prices
-        self.strength_scores = {}
+        
+        # 價格區間以對齊的陣列儲存 (SoA), 均勻區間的中心價天然遞增
+        volumes = np.asarray(volume_profile, dtype=np.float64)
+        prices = price_min + (np.arange(volumes.size) + 0.5) * dx
+        
+        # 只分析正價位 (非正價位的±0.2%容差沒有意義)
+        valid = prices > 0
+        self.prices = prices[valid]
+        self.volumes = volumes[valid]
+        self.scores = np.zeros_like(self.prices)
+        
+        # 成交量 × 反彈係數, 首次calculate()時計算後重複使用
+        self.base_scores = None
         
     def calculate(self, current_price: float) -> Dict:
         """
         計算所有價位的支撐強度
         Returns:
             {
-                'levels': [價格列表],
-                'strengths': [強度分數列表],
-                'normalized': [標準化分數列表],
-                'ranks': [排名列表]
+                'levels': 價格陣列,
+                'strengths': 強度分數陣列,
+                'normalized': 標準化分數陣列,
+                'z_scores': Z-score陣列,
+                'ranks': 排名陣列,
+                'full_data': 完整資料DataFrame
             }
         """
-        # 1. 基於成交量計算基礎強度
-        self._calculate_volume_strength()
-        
-        # 2. 基於歷史反彈次數調整強度
-        self._adjust_by_bounces()
+        # 1+2. 基礎強度 = 成交量 × 反彈係數 (與當前價格無關, 只計算一次)
+        if self.base_scores is None:
+            self.base_scores = self.volumes * self._bounce_factor()
         
         # 3. 基於距離當前價格調整權重(越近越重要)
-        self._adjust_by_distance(current_price)
+        self.scores = self._distance_decay(current_price)
+        self.scores *= self.base_scores
         
         # 4. 標準化並排名
         results = self._normalize_and_rank()
         
         return results
     
-    def _calculate_volume_strength(self):
-        """基於成交量計算初始強度分數"""
-        for bin_idx, volume in self.volume_profile.items():
-            price = self.bin_prices.get(bin_idx, 0)
-            if price > 0:
-                # 基礎強度 = 成交量
-                self.strength_scores[price] = float(volume)
-    
-    def _adjust_by_bounces(self):
+    def _bounce_factor(self) -> np.ndarray:
         """
         計算每個價位的歷史反彈次數
         反彈定義: 價格觸及該區間後方向反轉
         """
         # 簡化版: 計算每個價位被測試的次數
-        for price in self.strength_scores.keys():
-            # 計算價格在該區間附近的K線數
-            tolerance = price * 0.002  # ±0.2%容差
-            touches = ((self.df['Low'] >= price - tolerance) & 
-                      (self.df['Low'] <= price + tolerance)).sum()
-            
-            # 權重: 觸碰次數越多,強度越強
-            bounce_factor = 1 + (touches * 0.1)  # 每次觸碰增加10%
-            self.strength_scores[price] *= bounce_factor
+        tolerance = self.prices * 0.002  # ±0.2%容差
+        touches = count_touches(self.lows, self.prices, tolerance)
+        
+        # 權重: 觸碰次數越多,強度越強
+        return 1 + (touches * 0.1)  # 每次觸碰增加10%
     
-    def _adjust_by_distance(self, current_price: float):
+    def _distance_decay(self, current_price: float) -> np.ndarray:
         """
         根據距離當前價格的遠近調整權重
         距離越近,重要性越高
         """
-        for price in self.strength_scores.keys():
-            distance_ratio = abs(price - current_price) / current_price
-            
-            # 距離衰減函數: 距離越遠,權重越低
-            # 使用指數衰減: e^(-k*distance)
-            decay_factor = np.exp(-5 * distance_ratio)  # k=5
-            self.strength_scores[price] *= decay_factor
+        # 距離衰減函數: 距離越遠,權重越低
+        # 使用指數衰減: e^(-k*distance), 全部在同一個緩衝區就地計算
+        decay_factor = np.subtract(self.prices, current_price)
+        np.abs(decay_factor, out=decay_factor)
+        decay_factor *= -5.0 / current_price  # k=5
+        np.exp(decay_factor, out=decay_factor)
+        return decay_factor
     
     def _normalize_and_rank(self) -> Dict:
         """標準化分數並排名"""
-        # 轉換為DataFrame方便操作
-        df = pd.DataFrame({
-            'price': list(self.strength_scores.keys()),
-            'strength': list(self.strength_scores.values())
-        }).sort_values('price')
+        strength = self.scores
         
-        # 標準化 (Z-score)
-        df['z_score'] = zscore(df['strength'])
+        # 標準化 (Z-score, 母體標準差)
+        z_score = (strength - strength.mean()) / strength.std()
         
         # Min-Max標準化到0-100
-        min_val = df['strength'].min()
-        max_val = df['strength'].max()
-        df['normalized'] = ((df['strength'] - min_val) / (max_val - min_val) * 100).round(2)
+        min_val = strength.min()
+        max_val = strength.max()
+        normalized = np.round((strength - min_val) / (max_val - min_val) * 100, 2)
         
         # 排名 (分數越高排名越前)
-        df['rank'] = df['normalized'].rank(ascending=False, method='min').astype(int)
+        rank = _rank_descending(normalized)
         
         # 過濾掉強度太低的(保留Top 30%)
-        threshold = df['normalized'].quantile(0.70)
-        df_filtered = df[df['normalized'] >= threshold].copy()
+        threshold = np.quantile(normalized, 0.70)
+        mask = normalized >= threshold
         
-        # 重新排名
-        df_filtered['rank'] = df_filtered['normalized'].rank(ascending=False, method='min').astype(int)
+        # 保留的都是分數最高者, 比某價位分數高的價位必定也被保留,
+        # 因此完整資料的名次就是過濾後的名次, 不需重新排名
+        filtered_rank = rank[mask]
+        
+        # 完整資料最後才組成DataFrame
+        df = pd.DataFrame({
+            'price': self.prices,
+            'strength': strength,
+            'z_score': z_score,
+            'normalized': normalized,
+            'rank': rank
+        })
         
         return {
-            'levels': df_filtered['price'].round(2).tolist(),
-            'strengths': df_filtered['strength'].round(0).tolist(),
-            'normalized': df_filtered['normalized'].tolist(),
-            'z_scores': df_filtered['z_score'].round(2).tolist(),
-            'ranks': df_filtered['rank'].tolist(),
+            'levels': np.round(self.prices[mask], 2),
+            'strengths': np.round(strength[mask], 0),
+            'normalized': normalized[mask],
+            'z_scores': np.round(z_score[mask], 2),
+            'ranks': filtered_rank,
             'full_data': df  # 保留完整資料供繪圖使用
         }
     
@@ -125,22 +172,21 @@ class SupportStrengthAnalyzer:
             results: calculate()的返回結果
             n: 取前幾名
             above_price: 如果指定,只取該價格以下的支撐位
+        Returns:
+            {'levels': 價格陣列, 'scores': 標準化分數陣列, 'ranks': 排名陣列} (依排名排序)
         """
-        df = pd.DataFrame({
-            'price': results['levels'],
-            'normalized': results['normalized'],
-            'rank': results['ranks']
-        })
+        levels = np.asarray(results['levels'])
+        ranks = np.asarray(results['ranks'])
         
-        # 過濾條件
+        # 過濾條件: 只記錄候選位置, 最後才一次取出各欄
         if above_price:
-            df = df[df['price'] < above_price]
-        
-        # 取前N
-        df = df.nsmallest(n, 'rank')
+            candidates = np.flatnonzero(levels < above_price)
+            idx = candidates[_smallest_n(ranks[candidates], n)]
+        else:
+            idx = _smallest_n(ranks, n)
         
         return {
-            'levels': df['price'].tolist(),
-            'scores': df['normalized'].tolist(),
-            'ranks': df['rank'].tolist()
+            'levels': levels[idx],
+            'scores': np.asarray(results['normalized'])[idx],
+            'ranks': ranks[idx]
         }
@@ -9,11 +9,101 @@ from scipy.signal import find_peaks, savgol_filter
 from typing import Dict, List, Tuple
 import logging
 
+
+# Savitzky-Golay smoothing (window 11, cubic) used for node detection.
+# Least-squares cubic fit over one window, as a matrix (V @ pinv(V)): the middle row
+# holds the interior taps, the rows above/below fit the two edges exactly like
+# savgol_filter's default 'interp' mode. Built once at import (~tens of microseconds).
+_SG_WINDOW = 11
+_SG_POLYORDER = 3
+_SG_VANDER = np.vander(np.arange(_SG_WINDOW) - _SG_WINDOW // 2.0, _SG_POLYORDER + 1)
+_SG_OPERATOR = _SG_VANDER @ np.linalg.pinv(_SG_VANDER)
+
+
+def _savgol_smooth(vol: np.ndarray) -> np.ndarray:
+    """Equivalent to savgol_filter(vol, 11, 3) without rebuilding the fit on every call"""
+    n, half = len(vol), _SG_WINDOW // 2
+    if n < _SG_WINDOW:
+        # window_length must be odd and <= len(x)
+        window = n if n % 2 else n - 1
+        return savgol_filter(vol, window, _SG_POLYORDER) if window > 3 else vol
+    
+    smoothed = np.empty(n)
+    smoothed[half:n - half] = np.correlate(vol, _SG_OPERATOR[half], mode='valid')
+    smoothed[:half] = _SG_OPERATOR[:half] @ vol[:_SG_WINDOW]
+    smoothed[n - half:] = _SG_OPERATOR[half + 1:] @ vol[n - _SG_WINDOW:]
+    return smoothed
+
+
+def analyze_profile(vol: np.ndarray, va_range: float) -> Tuple[int, int, int, np.ndarray, np.ndarray]:
+    """
+    Derive POC, Value Area and volume nodes from a volume profile array.
+    Each step makes its own NumPy passes over the (small) profile.
+    
+    Args:
+        vol: Volume per bin (ascending price)
+        va_range: Value Area percentage
+        
+    Returns:
+        (poc_idx, vah_idx, val_idx, hvn_idx, lvn_idx) as bin indices
+    """
+    # Point of Control (Max Volume)
+    poc_idx = int(vol.argmax())
+    
+    # Value Area High (VAH) and Low (VAL)
+    target_volume = vol.sum() * va_range
+    vah_idx, val_idx = _value_area_bounds(vol, poc_idx, target_volume)
+    
+    # High Volume Nodes (HVN) and Low Volume Nodes (LVN)
+    hvn_idx, lvn_idx = _find_nodes(vol)
+    
+    return poc_idx, vah_idx, val_idx, hvn_idx, lvn_idx
+
+
+def _value_area_bounds(vol: np.ndarray, poc_idx: int, target_volume: float) -> Tuple[int, int]:
+    """Expand from the POC until target_volume is covered; returns (upper_idx, lower_idx)"""
+    if vol[poc_idx] >= target_volume:
+        return poc_idx, poc_idx
+    
+    # Standard VP logic expands one bin at a time towards the side with the
+    # higher immediate neighbour (ties go down). That greedy walk is a merge of
+    # the bins below and above the POC; ordering each side by its running
+    # minimum reproduces it exactly, so one stable sort replaces the loop.
+    below = vol[poc_idx - 1::-1] if poc_idx > 0 else vol[:0]
+    above = vol[poc_idx + 1:]
+    keys = np.concatenate([np.minimum.accumulate(below) if below.size else below,
+                           np.minimum.accumulate(above) if above.size else above])
+    order = np.argsort(-keys, kind='stable')
+    
+    # Number of bins needed to reach the target (stops at the range boundaries)
+    cum_volume = vol[poc_idx] + np.cumsum(np.concatenate([below, above])[order])
+    n_taken = min(int(np.searchsorted(cum_volume, target_volume, side='left')) + 1, order.size)
+    n_upper = int(np.count_nonzero(order[:n_taken] >= below.size))
+    
+    return poc_idx + n_upper, poc_idx - (n_taken - n_upper)
+
+
+def _find_nodes(vol: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Peaks (HVN) and valleys (LVN) of the smoothed profile; returns bin indices"""
+    # Use Savitzky-Golay filter to smooth noise
+    smoothed_vol = _savgol_smooth(vol)
+    
+    prominence = np.max(smoothed_vol) * 0.05  # 5% prominence
+    
+    # Find Peaks (HVN)
+    peaks, _ = find_peaks(smoothed_vol, prominence=prominence)
+    
+    # Find Valleys (LVN) - Invert signal
+    valleys, _ = find_peaks(-smoothed_vol, prominence=prominence)
+    
+    return peaks, valleys
+
+
 class VolumeProfileAnalyzer:
     def __init__(self, df: pd.DataFrame, n_bins: int = 100, va_range: float = 0.70):
         """
         Args:
-            df: DataFrame containing 'Close' and 'Volume'
+            df: DataFrame containing 'High', 'Low', 'Close' and 'Volume' (not modified)
             n_bins: Number of price bins (histogram resolution)
             va_range: Value Area percentage (default 70%)
         """
@@ -22,8 +112,17 @@ class VolumeProfileAnalyzer:
         self.va_range = va_range
         self.logger = logging.getLogger(__name__)
         
+        # Pre-extract column arrays once; the analysis never writes to the caller's DataFrame.
+        # The input dtype is kept (float32 from DataLoader) so no widened copies are made.
+        self.low = df['Low'].to_numpy()
+        self.high = df['High'].to_numpy()
+        self.close = df['Close'].to_numpy()
+        self.volume = df['Volume'].to_numpy()
+        
         # Calculation results
         self.profile = None
+        self.price_min = None
+        self.dx = None
         self.poc_price = None
         self.vah = None
         self.val = None
@@ -33,101 +132,49 @@ class VolumeProfileAnalyzer:
     def calculate(self) -> Dict:
         """Execute the full volume profile analysis"""
         self._build_histogram()
-        self._calculate_poc()
-        self._calculate_value_area()
-        self._identify_nodes()
+        
+        # POC, Value Area and HVN/LVN from the profile array
+        poc_idx, vah_idx, val_idx, hvn_idx, lvn_idx = analyze_profile(self.profile, self.va_range)
+        
+        self.max_vol_idx = poc_idx
+        self.poc_price = float(self.bin_price(poc_idx))
+        self.vah = float(self.bin_price(vah_idx))
+        self.val = float(self.bin_price(val_idx))
+        self.hvns = self.bin_price(hvn_idx).tolist()
+        self.lvns = self.bin_price(lvn_idx).tolist()
         
         return self.get_results()
 
     def _build_histogram(self):
         """Create price-volume histogram"""
         # Determine price range
-        price_min = self.df['Low'].min()
-        price_max = self.df['High'].max()
+        price_min = float(np.nanmin(self.low))
+        price_max = float(np.nanmax(self.high))
         
-        # Create bins
-        bins = np.linspace(price_min, price_max, self.n_bins + 1)
+        # Uniform bins: bin i spans [price_min + i*dx, price_min + (i+1)*dx)
+        self.price_min = price_min
+        self.dx = (price_max - price_min) / self.n_bins
         
         # Assign volume to bins
         # We assume volume occurred at the 'Close' price for simplicity in this version.
         # A more advanced version would distribute volume across High-Low range.
-        self.df['bin_idx'] = np.digitize(self.df['Close'], bins)
-        
-        # Group by bin and sum volume
-        grouped = self.df.groupby('bin_idx')['Volume'].sum()
-        
-        # Reindex to ensure all bins exist (even with 0 volume)
-        all_bins = pd.Series(0, index=np.arange(1, self.n_bins + 2))
-        self.profile = all_bins.add(grouped, fill_value=0)
+        # Bins are uniform, so the bin index is a constant-time rescale (no binary search).
+        close, vols = self.close, self.volume
         
-        # Map bin index back to price
-        self.bin_prices = {i: (bins[i-1] + bins[i])/2 for i in range(1, len(bins))}
-
-    def _calculate_poc(self):
-        """Find Point of Control (Max Volume)"""
-        max_vol_idx = self.profile.idxmax()
-        self.poc_price = self.bin_prices.get(max_vol_idx, 0.0)
-        self.max_vol_idx = max_vol_idx
-
-    def _calculate_value_area(self):
-        """Calculate Value Area High (VAH) and Low (VAL)"""
-        total_volume = self.profile.sum()
-        target_volume = total_volume * self.va_range
+        # Skip rows with missing close/volume (pandas groupby used to drop them)
+        valid = np.isfinite(close) & np.isfinite(vols)
+        if not valid.all():
+            close, vols = close[valid], vols[valid]
         
-        # Start from POC and expand
-        current_volume = self.profile.loc[self.max_vol_idx]
-        upper_idx = self.max_vol_idx
-        lower_idx = self.max_vol_idx
+        scale = 1.0 / self.dx if self.dx > 0 else 0.0
+        bin_idx = np.clip(((close - price_min) * scale).astype(np.intp), 0, self.n_bins - 1)
         
-        # Expansion loop
-        while current_volume < target_volume:
-            # Check next upper and lower bins
-            next_upper = upper_idx + 1
-            next_lower = lower_idx - 1
-            
-            vol_upper = self.profile.get(next_upper, 0)
-            vol_lower = self.profile.get(next_lower, 0)
-            
-            # Expand towards the side with higher volume (standard VP logic)
-            # Or expand both if we want strict symmetric search? 
-            # Standard: Dual expansion usually favors the higher immediate neighbor
-            
-            if vol_upper > vol_lower:
-                current_volume += vol_upper
-                upper_idx = next_upper
-            else:
-                current_volume += vol_lower
-                lower_idx = next_lower
-                
-            # Break if we hit boundaries
-            if next_upper > self.n_bins and next_lower < 1:
-                break
-                
-        self.vah = self.bin_prices.get(upper_idx, 0.0)
-        self.val = self.bin_prices.get(lower_idx, 0.0)
-
-    def _identify_nodes(self):
-        """Identify High Volume Nodes (HVN) and Low Volume Nodes (LVN)"""
-        # Smooth the profile for peak detection
-        vol_array = self.profile.sort_index().values
-        
-        # Use Savitzky-Golay filter to smooth noise
-        # window_length must be odd and <= len(x)
-        window = min(11, len(vol_array))
-        if window % 2 == 0: window -= 1
-        
-        if window > 3:
-            smoothed_vol = savgol_filter(vol_array, window, 3)
-        else:
-            smoothed_vol = vol_array
-
-        # Find Peaks (HVN)
-        peaks, _ = find_peaks(smoothed_vol, prominence=np.max(smoothed_vol)*0.05) # 5% prominence
-        self.hvns = [self.bin_prices.get(self.profile.index[i], 0.0) for i in peaks]
-        
-        # Find Valleys (LVN) - Invert signal
-        valleys, _ = find_peaks(-smoothed_vol, prominence=np.max(smoothed_vol)*0.05)
-        self.lvns = [self.bin_prices.get(self.profile.index[i], 0.0) for i in valleys]
+        # Sum volume per bin in a single pass (bincount accumulates in float64)
+        self.profile = np.bincount(bin_idx, weights=vols, minlength=self.n_bins)
+
+    def bin_price(self, idx):
+        """Map bin index (scalar or array) to the bin's center price"""
+        return self.price_min + (np.asarray(idx) + 0.5) * self.dx
 
     def get_results(self) -> Dict:
         return {
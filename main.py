@@ -34,7 +34,7 @@ def main():
     try:
         with console.status("[bold green]Fetching Data...[/]"):
             df = loader.fetch_data(period=args.period, interval="5m") # Use 5m for granularity
-            current_price = loader.get_latest_price()
+            current_price = loader.get_latest_price(df)
             
         console.print(f"✅ Data loaded: [cyan]{len(df)}[/] candles. Last Price: [bold white]{current_price:.2f}[/]")
         
@@ -53,7 +53,8 @@ def main():
             strength_analyzer = SupportStrengthAnalyzer(
                 df, 
                 analyzer.profile, 
-                analyzer.bin_prices
+                analyzer.price_min,
+                analyzer.dx
             )
             strength_results = strength_analyzer.calculate(current_price)
             
@@ -0,0 +1,42 @@
+"""
+Equivalence checks for the NumPy ranking/selection helpers in SupportStrengthAnalyzer.
+"""
+
+import numpy as np
+import pandas as pd
+
+from core.support_strength import _rank_descending, _smallest_n
+
+
+def _random_scores(rng):
+    # Rounded 0-100 scores with heavy ties, like the normalized column
+    n = int(rng.integers(1, 40))
+    return np.round(rng.integers(0, 8, n) * 12.5, 2)
+
+
+def test_rank_descending_matches_pandas_min_rank():
+    rng = np.random.default_rng(0)
+    for _ in range(5000):
+        scores = _random_scores(rng)
+        expected = pd.Series(scores).rank(ascending=False, method='min').astype(int).to_numpy()
+        
+        np.testing.assert_array_equal(_rank_descending(scores), expected)
+
+
+def test_full_rank_equals_rank_within_top_30_percent():
+    rng = np.random.default_rng(1)
+    for _ in range(5000):
+        scores = _random_scores(rng)
+        mask = scores >= np.quantile(scores, 0.70)
+        
+        np.testing.assert_array_equal(_rank_descending(scores)[mask], _rank_descending(scores[mask]))
+
+
+def test_smallest_n_matches_nsmallest_keep_first():
+    rng = np.random.default_rng(2)
+    for _ in range(3000):
+        ranks = rng.integers(1, 6, int(rng.integers(0, 20)))
+        n = int(rng.integers(0, 25))
+        expected = pd.DataFrame({'rank': ranks}).nsmallest(n, 'rank', keep='first').index.to_numpy()
+        
+        np.testing.assert_array_equal(_smallest_n(ranks, n), expected)
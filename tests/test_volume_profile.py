@@ -0,0 +1,50 @@
+"""
+Equivalence checks for the vectorized volume profile helpers.
+"""
+
+import numpy as np
+from scipy.signal import savgol_filter
+
+from core.volume_profile import _savgol_smooth, _value_area_bounds
+
+
+def _greedy_value_area(vol, poc_idx, target_volume):
+    """Reference two-pointer expansion: step to the larger neighbour (ties go down), stop at the range boundaries"""
+    n = len(vol)
+    current_volume = vol[poc_idx]
+    upper_idx = lower_idx = poc_idx
+    while current_volume < target_volume:
+        next_upper, next_lower = upper_idx + 1, lower_idx - 1
+        if next_upper >= n and next_lower < 0:
+            break
+        if next_lower < 0 or (next_upper < n and vol[next_upper] > vol[next_lower]):
+            current_volume += vol[next_upper]
+            upper_idx = next_upper
+        else:
+            current_volume += vol[next_lower]
+            lower_idx = next_lower
+    return upper_idx, lower_idx
+
+
+def test_value_area_matches_greedy_expansion():
+    rng = np.random.default_rng(0)
+    for _ in range(20000):
+        n = int(rng.integers(1, 30))
+        # Small integers give plenty of zeros and ties
+        vol = rng.integers(0, 4, n).astype(float) * rng.choice([1.0, 1000.5])
+        poc_idx = int(vol.argmax()) if rng.random() < 0.7 else int(rng.integers(0, n))
+        target_volume = vol.sum() * rng.choice([0.3, 0.7, 0.99, 1.0])
+        
+        expected = _greedy_value_area(vol, poc_idx, target_volume)
+        assert _value_area_bounds(vol, poc_idx, target_volume) == expected, (vol, poc_idx, target_volume)
+
+
+def test_savgol_smooth_matches_savgol_filter():
+    rng = np.random.default_rng(0)
+    for n in range(1, 301):
+        vol = rng.random(n) * 1e5
+        window = min(11, n)
+        if window % 2 == 0: window -= 1
+        expected = savgol_filter(vol, window, 3) if window > 3 else vol
+        
+        np.testing.assert_allclose(_savgol_smooth(vol), expected, rtol=0, atol=1e-6)